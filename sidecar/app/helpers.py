@@ -1,11 +1,12 @@
 import tomllib
+from collections.abc import Iterator
 from dataclasses import dataclass
 from enum import IntEnum
-from json import JSONDecodeError
 from pathlib import Path
 from urllib.parse import ParseResult, urlparse, urlunparse
 
 import httpx
+import orjson
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
 from cryptography.x509 import load_pem_x509_certificate
 
@@ -35,6 +36,15 @@ class Helper:
             )
         )
 
+    def query_status_stream_url(self, query_id: str) -> str:
+        return str(
+            urlunparse(
+                self.sidecar_url._replace(
+                    scheme="https", path=f"/start/{query_id}/status-stream"
+                ),
+            )
+        )
+
     def query_finish_url(self, query_id: str) -> str:
         return str(
             urlunparse(
@@ -59,12 +69,42 @@ class Helper:
         except httpx.RequestError:
             return Status.UNKNOWN
         try:
-            j = r.json()
-        except JSONDecodeError:
+            j = orjson.loads(r.content)
+        except orjson.JSONDecodeError:
             return Status.UNKNOWN
 
         return Status.from_json(j)
 
+    def stream_query_status(
+        self, query_id: str, timeout: float = 30
+    ) -> Iterator[Status]:
+        received_event = False
+        try:
+            with httpx.stream(
+                "GET", self.query_status_stream_url(query_id), timeout=timeout
+            ) as r:
+                if r.status_code != httpx.codes.OK:
+                    yield Status.UNKNOWN
+                    return
+                for line in r.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    try:
+                        j = orjson.loads(line.removeprefix("data:"))
+                    except orjson.JSONDecodeError:
+                        yield Status.UNKNOWN
+                        continue
+                    received_event = True
+                    yield Status.from_json(j)
+        except httpx.ReadTimeout:
+            # a stream sends the current status right away, so a timeout before
+            # then means the sidecar isn't responding. after it, there was just
+            # no status change within the timeout, so the caller can reconnect
+            if not received_event:
+                yield Status.UNKNOWN
+        except httpx.RequestError:
+            yield Status.UNKNOWN
+
     def kill_query(self, query_id: str) -> str:
         status = self.get_current_query_status(query_id)
         if status >= Status.COMPLETE:
@@ -1,33 +1,68 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True)
 class Paths:
     repo_path: Path
     config_path: Path
     compiled_id: str
-    _test_data_path: Optional[Path] = None
 
     @property
     def test_data_path(self) -> Path:
-        if self._test_data_path is None:
-            return self.repo_path / Path("test_data/input")
-        return self._test_data_path
+        return self.repo_path / Path("test_data/input")
 
-    @test_data_path.setter
-    def test_data_path(self, test_data_path: Path):
-        self._test_data_path = test_data_path
+    @lru_cache(maxsize=1024)
+    def events_file(
+        self, size: int, max_breakdown_key: int, max_trigger_value: int
+    ) -> Path:
+        # generated test data is reused by any query with the same name, so it
+        # includes every input of the (fixed seed) generator, including the
+        # commit of the report collector that produces it
+        return self.test_data_path / Path(
+            f"events-{self.compiled_id}-{size}-{max_breakdown_key}"
+            f"-{max_trigger_value}.txt"
+        )
+
+    @property
+    def network_config_path(self) -> Path:
+        return self.config_path / Path("network.toml")
+
+    @lru_cache(maxsize=1024)
+    def tls_cert_path(self, identity: int) -> Path:
+        return self.config_path / Path(f"pub/h{identity}.pem")
+
+    @lru_cache(maxsize=1024)
+    def tls_key_path(self, identity: int) -> Path:
+        return self.config_path / Path(f"h{identity}.key")
+
+    @lru_cache(maxsize=1024)
+    def mk_public_path(self, identity: int) -> Path:
+        return self.config_path / Path(f"pub/h{identity}_mk.pub")
+
+    @lru_cache(maxsize=1024)
+    def mk_private_path(self, identity: int) -> Path:
+        return self.config_path / Path(f"h{identity}_mk.key")
+
+    @property
+    def bare_repo_path(self) -> Path:
+        return self.repo_path.with_suffix(".git")
 
     @property
     def target_path(self) -> Path:
-        return self.repo_path / Path(f"target-{self.compiled_id}")
+        # shared by every compiled_id, so dependencies that don't change
+        # with the feature flags are reused by cargo between builds
+        return self.repo_path / Path("target-shared")
+
+    @property
+    def bin_path(self) -> Path:
+        return self.repo_path / Path(f"bin-{self.compiled_id}")
 
     @property
     def helper_binary_path(self) -> Path:
-        return self.target_path / Path("release/helper")
+        return self.bin_path / Path("helper")
 
     @property
     def report_collector_binary_path(self) -> Path:
-        return self.target_path / Path("release/report_collector")
+        return self.bin_path / Path("report_collector")
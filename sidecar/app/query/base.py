@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import asyncio
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import ClassVar, Optional, TypeVar
@@ -35,11 +35,14 @@ class Query:
 
     Steps implement a `build_from_query` method,
     which allows them to utilize data stored on the query.
+
+    Each step is started once all of the steps in its `depends_on` have succeeded,
+    so steps that don't depend on each other run concurrently.
     """
 
     # pylint: disable=too-many-instance-attributes
     query_id: str
-    current_step: Optional[Step] = field(init=False, default=None, repr=True)
+    current_steps: list[Step] = field(init=False, default_factory=list, repr=True)
     logger: loguru.Logger = field(init=False, repr=False, compare=False)
     _logger_id: int = field(init=False, repr=False, compare=False)
     role: Role = field(init=False, repr=True)
@@ -94,59 +97,89 @@ class Query:
         return self._status_history.status_event_json
 
     @property
-    def running(self):
-        return self.started and not self.finished
+    def status_event_json_bytes(self) -> bytes:
+        return self._status_history.status_event_json_bytes
 
     @property
-    def steps(self) -> Iterable[Step]:
-        for step_class in self.step_classes:
-            yield step_class.build_from_query(self)
+    def running(self):
+        return self.started and not self.finished
 
     def start(self):
+        asyncio.run(self._run_steps())
+        if not self.finished:
+            self.finish()
+
+    async def _run_steps(self):
+        pending_step_classes = list(self.step_classes)
+        completed_step_classes: set[type[Step]] = set()
+        running_tasks: dict[asyncio.Task, Step] = {}
         try:
-            for step in self.steps:
+            while pending_step_classes or running_tasks:
                 if self.finished:
                     break
-                self.logger.info(f"Starting: {step}")
-                self.status = step.status
-                self.current_step = step
-                step.start()
-                if not step.success:
-                    self.crash()
+                ready_step_classes = [
+                    step_class
+                    for step_class in pending_step_classes
+                    if completed_step_classes.issuperset(step_class.depends_on)
+                ]
+                for step_class in ready_step_classes:
+                    pending_step_classes.remove(step_class)
+                    step = step_class.build_from_query(self)
+                    self.logger.info(f"Starting: {step}")
+                    self.status = max(self.status, step.status)
+                    self.current_steps.append(step)
+                    task = asyncio.create_task(asyncio.to_thread(step.start))
+                    running_tasks[task] = step
+                if not running_tasks:
+                    raise ValueError(
+                        f"Unable to start {pending_step_classes}: "
+                        "dependencies are not in step_classes."
+                    )
+
+                done, _ = await asyncio.wait(
+                    running_tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    step = running_tasks.pop(task)
+                    if step in self.current_steps:
+                        self.current_steps.remove(step)
+                    task.result()
+                    if not step.success:
+                        self.crash()
+                        return
+                    completed_step_classes.add(type(step))
         # pylint: disable=broad-exception-caught
         except Exception as e:
             # intentially crash on any python exception
             # as well as command failure
             self.logger.error(e)
             self.crash()
-        if not self.finished:
-            self.finish()
 
     def finish(self):
         self.status = Status.COMPLETE
         self.logger.info(f"Finishing: {self=}")
-        if self.current_step:
-            self.current_step.finish()
+        for step in list(self.current_steps):
+            step.finish()
         self._cleanup()
 
     def kill(self):
         if self.running:
             self.status = Status.KILLED
             self.logger.info(f"Killing: {self=}")
-            if self.current_step:
-                self.current_step.terminate()
+            for step in list(self.current_steps):
+                step.terminate()
         self._cleanup()
 
     def crash(self):
         if self.running:
             self.status = Status.CRASHED
             self.logger.info(f"CRASHING! {self=}")
-            if self.current_step:
-                self.current_step.kill()
+            for step in list(self.current_steps):
+                step.kill()
         self._cleanup()
 
     def _cleanup(self):
-        self.current_step = None
+        self.current_steps = []
         try:
             self.logger.remove(self._logger_id)
         except ValueError:
@@ -154,15 +187,11 @@ class Query:
 
     @property
     def cpu_usage_percent(self) -> float:
-        if self.current_step:
-            return self.current_step.cpu_usage_percent
-        return 0
+        return sum(step.cpu_usage_percent for step in list(self.current_steps))
 
     @property
     def memory_rss_usage(self) -> int:
-        if self.current_step:
-            return self.current_step.memory_rss_usage
-        return 0
+        return sum(step.memory_rss_usage for step in list(self.current_steps))
 
 
 QueryTypeT = TypeVar("QueryTypeT", bound=Query)
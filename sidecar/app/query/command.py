@@ -1,8 +1,6 @@
 from __future__ import annotations
 
 import os
-import select
-import shlex
 import subprocess
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -14,7 +12,7 @@ import psutil
 
 @dataclass
 class Command:
-    cmd: str
+    cmd: list[str]
     env: Optional[dict] = field(default_factory=lambda: {**os.environ}, repr=False)
     cwd: Optional[Path] = field(default=None, repr=True)
     process: Optional[subprocess.Popen] = field(init=False, default=None, repr=True)
@@ -62,13 +60,21 @@ class Command:
             return 0
         return process_psutil.memory_info().rss
 
-    def build_process(self):
+    def popen(self, **kwargs) -> subprocess.Popen:
+        # python only creates non-inheritable fds (PEP 446), so close_fds has
+        # nothing to close. leaving it off skips that work in the child, and lets
+        # subprocess use posix_spawn when the executable is given as a path
         return subprocess.Popen(
-            shlex.split(self.cmd),
+            self.cmd,
             env=self.env,
             cwd=self.cwd,
+            close_fds=False,
+            **kwargs,
         )
 
+    def build_process(self):
+        return self.popen()
+
     def start(self):
         self.process = self.build_process()
         self.process.wait()
@@ -92,12 +98,7 @@ class FileOutputCommand(Command):
     output_file: Optional[TextIO] = field(repr=False, init=False)
 
     def build_process(self):
-        return subprocess.Popen(
-            shlex.split(self.cmd),
-            stdout=self.output_file,
-            env=self.env,
-            cwd=self.cwd,
-        )
+        return self.popen(stdout=self.output_file)
 
     def start(self):
         # build_process needs to return, so this needs to be manually closed
@@ -112,35 +113,19 @@ class LoggerOutputCommand(Command):
     logger: loguru.Logger = field(repr=False)
 
     def build_process(self):
-        return subprocess.Popen(
-            shlex.split(self.cmd),
-            env=self.env,
-            cwd=self.cwd,
+        return self.popen(
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
         )
 
     def start(self):
         self.process = self.build_process()
-        stdout_fileno = self.process.stdout.fileno()
-        stderr_fileno = self.process.stderr.fileno()
-        while self.process.poll() is None:
-            readable, _, _ = select.select([stdout_fileno, stderr_fileno], [], [])
-            for fd in readable:
-                if fd == stdout_fileno:
-                    stdout_line = self.process.stdout.readline()
-                    if stdout_line:
-                        self.logger.info(stdout_line.rstrip("\n"))
-                elif fd == stderr_fileno:
-                    stderr_line = self.process.stderr.readline()
-                    if stderr_line:
-                        self.logger.info(stderr_line.rstrip("\n"))
+        # stderr is merged into stdout, so a single blocking read
+        # gets every line in order, without polling two pipes
         for line in self.process.stdout:
             self.logger.info(line.rstrip("\n"))
-
-        for line in self.process.stderr:
-            self.logger.info(line.rstrip("\n"))
+        self.process.wait()
 
 
 class ParallelCommandContextManager:
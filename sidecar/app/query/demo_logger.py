@@ -24,9 +24,14 @@ class DemoLoggerStep(LoggerOutputCommandStep):
 
     def build_command(self) -> LoggerOutputCommand:
         return LoggerOutputCommand(
-            cmd=f".venv/bin/python sidecar/logger "
-            f"--num-lines {self.num_lines} "
-            f"--total-runtime {self.total_runtime}",
+            cmd=[
+                ".venv/bin/python",
+                "sidecar/logger",
+                "--num-lines",
+                str(self.num_lines),
+                "--total-runtime",
+                str(self.total_runtime),
+            ],
             logger=self.logger,
         )
 
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from enum import StrEnum
 from pathlib import Path
-from typing import ClassVar
+from typing import ClassVar, Optional
 
+import httpx
 import loguru
 
+from ..helpers import Helper
 from ..local_paths import Paths
 from ..settings import get_settings
 from .base import Query
@@ -20,6 +30,76 @@ class GateType(StrEnum):
     DESCRIPTIVE = "descriptive-gate"
 
 
+FULL_COMMIT_HASH_RE = re.compile(r"[0-9a-f]{40}")
+
+
+def is_full_commit_hash(commit_hash: str) -> bool:
+    return FULL_COMMIT_HASH_RE.fullmatch(commit_hash) is not None
+
+
+def helper_feature_flags(
+    *,
+    gate_type: GateType,
+    stall_detection: bool,
+    multi_threading: bool,
+    disable_metrics: bool,
+    reveal_aggregation: bool,
+) -> tuple[str, ...]:
+    optional_features = {
+        "stall-detection": stall_detection,
+        "multi-threading": multi_threading,
+        "reveal-aggregation": reveal_aggregation,
+        "disable-metrics": disable_metrics,
+    }
+    return (
+        "web-app",
+        "real-world-infra",
+        gate_type,
+        *(feature for feature, enabled in optional_features.items() if enabled),
+    )
+
+
+def commit_exists(repo_path: Path, commit_hash: str) -> bool:
+    # the bare repo is a partial clone, where a missing object is fetched from
+    # origin on demand. this only checks what's local, so it never fetches
+    result = subprocess.run(
+        [
+            "git",
+            "-C",
+            str(repo_path),
+            "cat-file",
+            "-e",
+            f"{commit_hash}^{{commit}}",
+        ],
+        env={**os.environ, "GIT_NO_LAZY_FETCH": "1"},
+        capture_output=True,
+        check=False,
+    )
+    return result.returncode == 0
+
+
+def cargo_env(env: Optional[dict], cargo_home: Path) -> dict:
+    # a CARGO_HOME shared by every query keeps the registry and git caches
+    # that cargo fetch fills, so builds can run --offline
+    return {**(env or os.environ), "CARGO_HOME": str(cargo_home)}
+
+
+def cargo_build_env(env: Optional[dict], cargo_home: Path, sccache_dir: Path) -> dict:
+    env = cargo_env(env, cargo_home)
+    # sccache is an optional runtime dependency, without it builds aren't cached
+    if shutil.which("sccache") is not None:
+        env["RUSTC_WRAPPER"] = "sccache"
+        env["SCCACHE_DIR"] = str(sccache_dir)
+        # sccache can't cache incrementally compiled crates
+        env["CARGO_INCREMENTAL"] = "0"
+    return env
+
+
+def copy_binary(built_binary_path: Path, binary_path: Path):
+    binary_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(built_binary_path, binary_path)
+
+
 @dataclass(kw_only=True)
 class IPAQuery(Query):
     paths: Paths
@@ -27,10 +107,24 @@ class IPAQuery(Query):
 
     def send_kill_signals(self):
         self.logger.info("sending kill signals")
-        settings = get_settings()
-        for helper in settings.other_helpers:
-            response = helper.kill_query(self.query_id)
-            self.logger.info(response)
+        self._send_signals(Helper.kill_query)
+
+    def _send_signals(self, send_signal: Callable[[Helper, str], str]):
+        # signal every helper at once, so one slow or dead helper
+        # doesn't hold up (or prevent) signaling the others
+        other_helpers = get_settings().other_helpers
+        with ThreadPoolExecutor(max_workers=max(len(other_helpers), 1)) as executor:
+            futures = {
+                executor.submit(send_signal, helper, self.query_id): helper
+                for helper in other_helpers
+            }
+            for future in as_completed(futures):
+                try:
+                    self.logger.info(future.result())
+                except httpx.HTTPError as e:
+                    self.logger.error(
+                        f"failed to signal helper {futures[future].role}: {e!r}"
+                    )
 
     def crash(self):
         super().crash()
@@ -38,95 +132,266 @@ class IPAQuery(Query):
 
 
 @dataclass(kw_only=True)
-class IPACloneStep(LoggerOutputCommandStep):
-    repo_path: Path
+class IPAEnsureBareRepoStep(LoggerOutputCommandStep):
+    bare_repo_path: Path
     repo_url: ClassVar[str] = "https://github.com/private-attribution/ipa.git"
+    # bare clones don't configure any fetch refspecs, so they're set by the
+    # clone itself. pull request heads aren't included, see IPAFetchPullRequestsStep
+    fetch_refspecs: ClassVar[tuple[str, ...]] = ("+refs/heads/*:refs/remotes/origin/*",)
     status: ClassVar[Status] = Status.STARTING
 
     @classmethod
     def build_from_query(cls, query: IPAQuery):
         return cls(
-            repo_path=query.paths.repo_path,
+            bare_repo_path=query.paths.bare_repo_path,
             logger=query.logger,
         )
 
     def build_command(self) -> LoggerOutputCommand:
         return LoggerOutputCommand(
-            cmd=f"git clone {self.repo_url} {self.repo_path}",
+            cmd=[
+                "git",
+                "clone",
+                "--bare",
+                "--filter=blob:none",
+                "--no-tags",
+                *(f"--config=remote.origin.fetch={r}" for r in self.fetch_refspecs),
+                self.repo_url,
+                str(self.bare_repo_path),
+            ],
             logger=self.logger,
         )
 
     def pre_run(self):
-        if self.repo_path.exists():
+        if self.bare_repo_path.exists():
             self.skip = True
 
+    def post_run(self):
+        # pre_run skips any existing repo, so don't leave a partial clone behind
+        if not self.skip and not self.success:
+            shutil.rmtree(self.bare_repo_path, ignore_errors=True)
+
 
 @dataclass(kw_only=True)
-class IPAUpdateRemoteOriginStep(LoggerOutputCommandStep):
-    repo_path: Path
+class IPAFetchCommitStep(LoggerOutputCommandStep):
+    bare_repo_path: Path
+    commit_hash: str
     status: ClassVar[Status] = Status.STARTING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPAEnsureBareRepoStep,)
 
     @classmethod
     def build_from_query(cls, query: IPAQuery):
         return cls(
-            repo_path=query.paths.repo_path,
+            bare_repo_path=query.paths.bare_repo_path,
+            commit_hash=query.commit_hash,
             logger=query.logger,
         )
 
     def build_command(self) -> LoggerOutputCommand:
+        # a remote can only be asked for a full object name, so abbreviated
+        # hashes fall back to fetching the configured refspecs from origin
+        refspecs = [self.commit_hash] if is_full_commit_hash(self.commit_hash) else []
         return LoggerOutputCommand(
-            cmd=f"git -C {self.repo_path} config --add remote.origin.fetch "
-            "'+refs/pull/*/head:refs/remotes/origin/pr/*'",
+            cmd=[
+                "git",
+                "-C",
+                str(self.bare_repo_path),
+                "fetch",
+                "--filter=blob:none",
+                "origin",
+                *refspecs,
+            ],
             logger=self.logger,
         )
 
+    def pre_run(self):
+        # commits are immutable, so there's nothing to fetch if it's already local
+        if commit_exists(self.bare_repo_path, self.commit_hash):
+            self.skip = True
+
 
 @dataclass(kw_only=True)
-class IPAFetchUpstreamStep(LoggerOutputCommandStep):
-    repo_path: Path
+class IPAFetchPullRequestsStep(LoggerOutputCommandStep):
+    bare_repo_path: Path
+    commit_hash: str
+    pull_request_refspec: ClassVar[str] = "+refs/pull/*/head:refs/remotes/origin/pr/*"
     status: ClassVar[Status] = Status.STARTING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPAFetchCommitStep,)
 
     @classmethod
     def build_from_query(cls, query: IPAQuery):
         return cls(
-            repo_path=query.paths.repo_path,
+            bare_repo_path=query.paths.bare_repo_path,
+            commit_hash=query.commit_hash,
             logger=query.logger,
         )
 
     def build_command(self) -> LoggerOutputCommand:
+        # only runs when the commit isn't on any branch, e.g., an abbreviated
+        # hash of a pull request head. this fetches every pull request's head
         return LoggerOutputCommand(
-            cmd=f"git -C {self.repo_path} fetch --all",
+            cmd=[
+                "git",
+                "-C",
+                str(self.bare_repo_path),
+                "fetch",
+                "--filter=blob:none",
+                "origin",
+                self.pull_request_refspec,
+            ],
             logger=self.logger,
         )
 
+    def pre_run(self):
+        # the commit was on a branch (or fetched by its full hash)
+        if commit_exists(self.bare_repo_path, self.commit_hash):
+            self.skip = True
+
 
 @dataclass(kw_only=True)
 class IPACheckoutCommitStep(LoggerOutputCommandStep):
+    bare_repo_path: Path
     repo_path: Path
     commit_hash: str
     status: ClassVar[Status] = Status.STARTING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPAFetchPullRequestsStep,)
 
     @classmethod
     def build_from_query(cls, query: IPAQuery):
         return cls(
+            bare_repo_path=query.paths.bare_repo_path,
             repo_path=query.paths.repo_path,
             commit_hash=query.commit_hash,
             logger=query.logger,
         )
 
     def build_command(self) -> LoggerOutputCommand:
+        # the worktree persists across queries (along with its target dirs),
+        # so it's only added once and then moved to the requested commit
+        if (self.repo_path / Path(".git")).is_file():
+            cmd = [
+                "git",
+                "-C",
+                str(self.repo_path),
+                "checkout",
+                "-f",
+                "--detach",
+                self.commit_hash,
+            ]
+        else:
+            # git -C changes directory first, so the worktree path must be absolute
+            cmd = [
+                "git",
+                "-C",
+                str(self.bare_repo_path),
+                "worktree",
+                "add",
+                "-f",
+                "--detach",
+                str(self.repo_path.absolute()),
+                self.commit_hash,
+            ]
+        return LoggerOutputCommand(
+            cmd=cmd,
+            logger=self.logger,
+        )
+
+    def pre_run(self):
+        # anything else at repo_path (e.g., a full clone from before the bare
+        # repo) would make worktree add fail, so it's replaced by the worktree
+        if self.repo_path.exists() and not (self.repo_path / Path(".git")).is_file():
+            self.logger.info(f"removing {self.repo_path}, it isn't a worktree")
+            shutil.rmtree(self.repo_path)
+
+
+@dataclass(kw_only=True)
+class IPACargoFetchStep(LoggerOutputCommandStep):
+    manifest_path: Path
+    cargo_home: Path
+    commit_hash: str
+    fetched_marker: Optional[Path] = field(init=False, default=None, repr=False)
+    status: ClassVar[Status] = Status.STARTING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPACheckoutCommitStep,)
+
+    @classmethod
+    def build_from_query(cls, query: IPAQuery):
+        return cls(
+            manifest_path=query.paths.repo_path / Path("Cargo.toml"),
+            cargo_home=get_settings().cargo_home_path,
+            commit_hash=query.commit_hash,
+            logger=query.logger,
+        )
+
+    def build_command(self) -> LoggerOutputCommand:
+        # not --locked, so a checkout without a Cargo.lock gets one resolved here.
+        # the builds use --locked, so they only use what was fetched
         return LoggerOutputCommand(
-            cmd=f"git -C {self.repo_path} checkout -f {self.commit_hash}",
+            cmd=[
+                "cargo",
+                "fetch",
+                f"--manifest-path={self.manifest_path}",
+            ],
+            env=cargo_env(self.env, self.cargo_home),
             logger=self.logger,
         )
 
+    @property
+    def lockfile_path(self) -> Path:
+        return self.manifest_path.with_name("Cargo.lock")
+
+    def lockfile_tracked(self) -> bool:
+        result = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(self.manifest_path.parent),
+                "ls-files",
+                "--error-unmatch",
+                self.lockfile_path.name,
+            ],
+            capture_output=True,
+            check=False,
+        )
+        return result.returncode == 0
+
+    def fetched_marker_path(self) -> Optional[Path]:
+        if not self.lockfile_path.exists():
+            return None
+        lockfile_hash = hashlib.sha256(self.lockfile_path.read_bytes())
+        if not self.lockfile_tracked():
+            # checkouts keep untracked files, so this lockfile may have been
+            # resolved for the manifests of a previous commit
+            lockfile_hash.update(self.commit_hash.encode())
+        return self.cargo_home / Path("fetched") / Path(lockfile_hash.hexdigest())
+
+    def pre_run(self):
+        # the dependencies for this lockfile are already in cargo_home
+        self.fetched_marker = self.fetched_marker_path()
+        if self.fetched_marker is not None and self.fetched_marker.exists():
+            self.skip = True
+
+    def post_run(self):
+        if not self.success:
+            return
+        # cargo fetch may rewrite a stale lockfile, but the next checkout of the
+        # commit restores it, so the marker is for the lockfile as checked out.
+        # without one, the marker is for the lockfile cargo fetch resolved
+        fetched_marker = self.fetched_marker or self.fetched_marker_path()
+        if fetched_marker is not None:
+            fetched_marker.parent.mkdir(parents=True, exist_ok=True)
+            fetched_marker.touch()
+
 
 @dataclass(kw_only=True)
 class IPACorrdinatorCompileStep(LoggerOutputCommandStep):
     manifest_path: Path
     target_path: Path
+    report_collector_binary_path: Path
+    cargo_home: Path
+    sccache_dir: Path
     logger: loguru.Logger = field(repr=False)
     status: ClassVar[Status] = Status.COMPILING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPACargoFetchStep,)
 
     @classmethod
     def build_from_query(cls, query: IPAQuery):
@@ -134,64 +399,91 @@ class IPACorrdinatorCompileStep(LoggerOutputCommandStep):
         return cls(
             manifest_path=manifest_path,
             target_path=query.paths.target_path,
+            report_collector_binary_path=query.paths.report_collector_binary_path,
+            cargo_home=get_settings().cargo_home_path,
+            sccache_dir=get_settings().sccache_dir_path,
             logger=query.logger,
         )
 
     def build_command(self) -> LoggerOutputCommand:
         return LoggerOutputCommand(
-            cmd=f"cargo build --bin report_collector "
-            f"--manifest-path={self.manifest_path} "
-            f'--features="clap cli test-fixture" '
-            f"--target-dir={self.target_path} --release",
+            cmd=[
+                "cargo",
+                "build",
+                "--bin",
+                "report_collector",
+                f"--manifest-path={self.manifest_path}",
+                "--features=clap cli test-fixture",
+                f"--target-dir={self.target_path}",
+                "--release",
+                "--offline",
+                "--locked",
+            ],
+            env=cargo_build_env(self.env, self.cargo_home, self.sccache_dir),
             logger=self.logger,
         )
 
+    def post_run(self):
+        if self.success:
+            # the shared target dir is overwritten by the next build
+            copy_binary(
+                self.target_path / Path("release/report_collector"),
+                self.report_collector_binary_path,
+            )
+
 
-# pylint: disable=R0902
 @dataclass(kw_only=True)
 class IPAHelperCompileStep(LoggerOutputCommandStep):
     manifest_path: Path
     target_path: Path
-    gate_type: GateType
-    stall_detection: bool
-    multi_threading: bool
-    disable_metrics: bool
-    reveal_aggregation: bool
+    helper_binary_path: Path
+    cargo_home: Path
+    sccache_dir: Path
+    feature_flags: tuple[str, ...]
     logger: loguru.Logger = field(repr=False)
     status: ClassVar[Status] = Status.COMPILING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPACargoFetchStep,)
 
     @classmethod
     def build_from_query(cls, query: IPAHelperQuery):
         manifest_path = query.paths.repo_path / Path("Cargo.toml")
-        gate_type = query.gate_type
-        stall_detection = query.stall_detection
-        multi_threading = query.multi_threading
-        disable_metrics = query.disable_metrics
-        reveal_aggregation = query.reveal_aggregation
         return cls(
             manifest_path=manifest_path,
             target_path=query.paths.target_path,
-            gate_type=gate_type,
-            stall_detection=stall_detection,
-            multi_threading=multi_threading,
-            disable_metrics=disable_metrics,
-            reveal_aggregation=reveal_aggregation,
+            helper_binary_path=query.paths.helper_binary_path,
+            cargo_home=get_settings().cargo_home_path,
+            sccache_dir=get_settings().sccache_dir_path,
+            feature_flags=query.feature_flags,
             logger=query.logger,
         )
 
     def build_command(self) -> LoggerOutputCommand:
         return LoggerOutputCommand(
-            cmd=f"cargo build --bin helper --manifest-path={self.manifest_path} "
-            f'--features="web-app real-world-infra {self.gate_type}'
-            f"{' stall-detection' if self.stall_detection else ''}"
-            f"{' multi-threading' if self.multi_threading else ''}"
-            f"{' reveal-aggregation' if self.reveal_aggregation else ''}"
-            f"{' disable-metrics' if self.disable_metrics else ''}\" "
-            f"--no-default-features --target-dir={self.target_path} "
-            f"--release",
+            cmd=[
+                "cargo",
+                "build",
+                "--bin",
+                "helper",
+                f"--manifest-path={self.manifest_path}",
+                f"--features={' '.join(self.feature_flags)}",
+                "--no-default-features",
+                f"--target-dir={self.target_path}",
+                "--release",
+                "--offline",
+                "--locked",
+            ],
+            env=cargo_build_env(self.env, self.cargo_home, self.sccache_dir),
             logger=self.logger,
         )
 
+    def post_run(self):
+        if self.success:
+            # the shared target dir is overwritten by the next build
+            copy_binary(
+                self.target_path / Path("release/helper"),
+                self.helper_binary_path,
+            )
+
 
 @dataclass(kw_only=True)
 class IPACoordinatorGenerateTestDataStep(CommandStep):
@@ -201,10 +493,28 @@ class IPACoordinatorGenerateTestDataStep(CommandStep):
     max_breakdown_key: int
     max_trigger_value: int
     status: ClassVar[Status] = Status.COMPILING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPACorrdinatorCompileStep,)
+
+    @property
+    def partial_file_path(self) -> Path:
+        return self.output_file_path.with_suffix(".partial")
 
     def pre_run(self):
+        # generation is deterministic in its inputs, which are in the file name
+        if self.output_file_path.exists() and self.output_file_path.stat().st_size:
+            self.skip = True
+            return
         self.output_file_path.parent.mkdir(parents=True, exist_ok=True)
 
+    def post_run(self):
+        # written under a temporary name, so an interrupted run is never reused
+        if self.skip:
+            return
+        if self.success:
+            self.partial_file_path.replace(self.output_file_path)
+        else:
+            self.partial_file_path.unlink(missing_ok=True)
+
     @classmethod
     def build_from_query(cls, query: IPACoordinatorQuery):
         return cls(
@@ -217,17 +527,33 @@ class IPACoordinatorGenerateTestDataStep(CommandStep):
 
     def build_command(self) -> FileOutputCommand:
         return FileOutputCommand(
-            cmd=f"{self.report_collector_binary_path} gen-ipa-inputs -n {self.size} "
-            f"--max-breakdown-key {self.max_breakdown_key} --report-filter all "
-            f"--max-trigger-value {self.max_trigger_value} --seed 123",
-            output_file_path=self.output_file_path,
+            cmd=[
+                str(self.report_collector_binary_path),
+                "gen-ipa-inputs",
+                "-n",
+                str(self.size),
+                "--max-breakdown-key",
+                str(self.max_breakdown_key),
+                "--report-filter",
+                "all",
+                "--max-trigger-value",
+                str(self.max_trigger_value),
+                "--seed",
+                "123",
+            ],
+            output_file_path=self.partial_file_path,
         )
 
 
 @dataclass(kw_only=True)
 class IPACoordinatorWaitForHelpersStep(Step):
     query_id: str
+    # the query waits for this step's thread, so terminate/kill stop the wait
+    stopped: threading.Event = field(
+        init=False, default_factory=threading.Event, repr=False
+    )
     status: ClassVar[Status] = Status.WAITING_TO_START
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPACorrdinatorCompileStep,)
 
     @classmethod
     def build_from_query(cls, query: IPAQuery):
@@ -236,41 +562,53 @@ class IPACoordinatorWaitForHelpersStep(Step):
         )
 
     def run(self):
-        settings = get_settings()
-        for helper in settings.other_helpers:
-            max_unknonwn_status_wait_time = 100
-            current_unknown_status_wait_time = 0
-            loop_wait_time = 1
-            while True:
-                status = helper.get_current_query_status(self.query_id)
+        other_helpers = get_settings().other_helpers
+        for helper in other_helpers:
+            if not self._wait_for_helper(helper):
+                self.success = False
+                return
+        self.stopped.wait(3)  # allow enough time for the command to start
+
+    def _wait_for_helper(self, helper: Helper) -> bool:
+        max_unknown_status_wait_time = 100
+        loop_wait_time = 1
+        unknown_status_since = None
+        stream_query_status = helper.stream_query_status
+        while True:
+            # the stream yields each status change, and ends when the helper
+            # is unreachable or has no change within its timeout
+            for status in stream_query_status(self.query_id):
+                if self.stopped.is_set():
+                    return False
                 match status:
                     case Status.IN_PROGRESS:
-                        break
+                        return True
                     case Status.KILLED | Status.NOT_FOUND | Status.CRASHED:
-                        self.success = False
-                        return
+                        return False
                     case Status.STARTING | Status.COMPILING | Status.WAITING_TO_START:
                         # keep waiting while it's in a startup state
-                        continue
-                    case Status.UNKNOWN | Status.NOT_FOUND:
-                        # eventually fail if the status is unknown or not found
-                        # for ~100 seconds
-                        current_unknown_status_wait_time += loop_wait_time
-                        if (
-                            current_unknown_status_wait_time
-                            >= max_unknonwn_status_wait_time
+                        unknown_status_since = None
+                    case Status.UNKNOWN:
+                        # eventually fail if the status is unknown for ~100 seconds,
+                        # measured in wall time since a failed connection attempt
+                        # can take as long as the stream timeout
+                        if unknown_status_since is None:
+                            unknown_status_since = time.monotonic()
+                        elif (
+                            time.monotonic() - unknown_status_since
+                            >= max_unknown_status_wait_time
                         ):
-                            self.success = False
-                            return
+                            return False
 
-                time.sleep(1)
-        time.sleep(3)  # allow enough time for the command to start
+            # wait before reconnecting, so an unreachable helper isn't hammered
+            if self.stopped.wait(loop_wait_time):
+                return False
 
     def terminate(self):
-        return
+        self.stopped.set()
 
     def kill(self):
-        return
+        self.stopped.set()
 
     @property
     def cpu_usage_percent(self) -> float:
@@ -291,11 +629,15 @@ class IPACoordinatorStartStep(LoggerOutputCommandStep):
     per_user_credit_cap: int
     malicious_security: bool
     status: ClassVar[Status] = Status.IN_PROGRESS
+    depends_on: ClassVar[tuple[type[Step], ...]] = (
+        IPACoordinatorGenerateTestDataStep,
+        IPACoordinatorWaitForHelpersStep,
+    )
 
     @classmethod
     def build_from_query(cls, query: IPACoordinatorQuery):
         return cls(
-            network_config=query.paths.config_path / Path("network.toml"),
+            network_config=query.paths.network_config_path,
             report_collector_binary_path=query.paths.report_collector_binary_path,
             test_data_path=query.test_data_file,
             max_breakdown_key=query.max_breakdown_key,
@@ -312,10 +654,19 @@ class IPACoordinatorStartStep(LoggerOutputCommandStep):
             else "semi-honest-oprf-ipa-test"
         )
         return LoggerOutputCommand(
-            cmd=f"{self.report_collector_binary_path} --network {self.network_config} "
-            f"--input-file {self.test_data_path} {query_type} "
-            f"--max-breakdown-key {self.max_breakdown_key} "
-            f"--per-user-credit-cap {self.per_user_credit_cap} --plaintext-match-keys ",
+            cmd=[
+                str(self.report_collector_binary_path),
+                "--network",
+                str(self.network_config),
+                "--input-file",
+                str(self.test_data_path),
+                query_type,
+                "--max-breakdown-key",
+                str(self.max_breakdown_key),
+                "--per-user-credit-cap",
+                str(self.per_user_credit_cap),
+                "--plaintext-match-keys",
+            ],
             logger=self.logger,
         )
 
@@ -330,10 +681,11 @@ class IPACoordinatorQuery(IPAQuery):
     malicious_security: bool
 
     step_classes: ClassVar[list[type[Step]]] = [
-        IPACloneStep,
-        IPAUpdateRemoteOriginStep,
-        IPAFetchUpstreamStep,
+        IPAEnsureBareRepoStep,
+        IPAFetchCommitStep,
+        IPAFetchPullRequestsStep,
         IPACheckoutCommitStep,
+        IPACargoFetchStep,
         IPACorrdinatorCompileStep,
         IPACoordinatorGenerateTestDataStep,
         IPACoordinatorWaitForHelpersStep,
@@ -342,10 +694,7 @@ class IPACoordinatorQuery(IPAQuery):
 
     def send_finish_signals(self):
         self.logger.info("sending finish signals")
-        settings = get_settings()
-        for helper in settings.other_helpers:
-            resp = helper.finish_query(self.query_id)
-            self.logger.info(resp)
+        self._send_signals(Helper.finish_query)
 
     def finish(self):
         super().finish()
@@ -364,34 +713,42 @@ class IPAStartHelperStep(LoggerOutputCommandStep):
     mk_private_path: Path
     port: int
     status: ClassVar[Status] = Status.IN_PROGRESS
+    depends_on: ClassVar[tuple[type[Step], ...]] = (IPAHelperCompileStep,)
 
     @classmethod
     def build_from_query(cls, query: IPAHelperQuery):
         identity = query.role.value
-        network_path = query.paths.config_path / Path("network.toml")
-        tls_cert_path = query.paths.config_path / Path(f"pub/h{identity}.pem")
-        tls_key_path = query.paths.config_path / Path(f"h{identity}.key")
-        mk_public_path = query.paths.config_path / Path(f"pub/h{identity}_mk.pub")
-        mk_private_path = query.paths.config_path / Path(f"h{identity}_mk.key")
         return cls(
             helper_binary_path=query.paths.helper_binary_path,
             identity=identity,
-            network_path=network_path,
-            tls_cert_path=tls_cert_path,
-            tls_key_path=tls_key_path,
-            mk_public_path=mk_public_path,
-            mk_private_path=mk_private_path,
+            network_path=query.paths.network_config_path,
+            tls_cert_path=query.paths.tls_cert_path(identity),
+            tls_key_path=query.paths.tls_key_path(identity),
+            mk_public_path=query.paths.mk_public_path(identity),
+            mk_private_path=query.paths.mk_private_path(identity),
             port=query.port,
             logger=query.logger,
         )
 
     def build_command(self) -> LoggerOutputCommand:
         return LoggerOutputCommand(
-            cmd=f"{self.helper_binary_path} --network {self.network_path} "
-            f"--identity {self.identity} --tls-cert {self.tls_cert_path} "
-            f"--tls-key {self.tls_key_path} --port {self.port} "
-            f"--mk-public-key {self.mk_public_path} "
-            f"--mk-private-key {self.mk_private_path}",
+            cmd=[
+                str(self.helper_binary_path),
+                "--network",
+                str(self.network_path),
+                "--identity",
+                str(self.identity),
+                "--tls-cert",
+                str(self.tls_cert_path),
+                "--tls-key",
+                str(self.tls_key_path),
+                "--port",
+                str(self.port),
+                "--mk-public-key",
+                str(self.mk_public_path),
+                "--mk-private-key",
+                str(self.mk_private_path),
+            ],
             logger=self.logger,
         )
 
@@ -406,10 +763,21 @@ class IPAHelperQuery(IPAQuery):
     reveal_aggregation: bool
 
     step_classes: ClassVar[list[type[Step]]] = [
-        IPACloneStep,
-        IPAUpdateRemoteOriginStep,
-        IPAFetchUpstreamStep,
+        IPAEnsureBareRepoStep,
+        IPAFetchCommitStep,
+        IPAFetchPullRequestsStep,
         IPACheckoutCommitStep,
+        IPACargoFetchStep,
         IPAHelperCompileStep,
         IPAStartHelperStep,
     ]
+
+    @property
+    def feature_flags(self) -> tuple[str, ...]:
+        return helper_feature_flags(
+            gate_type=self.gate_type,
+            stall_detection=self.stall_detection,
+            multi_threading=self.multi_threading,
+            disable_metrics=self.disable_metrics,
+            reveal_aggregation=self.reveal_aggregation,
+        )
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import NamedTuple, Optional
 
 import loguru
+import orjson
 
 
 class Status(IntEnum):
@@ -41,6 +42,9 @@ class StatusHistory:
     _status_history: list[StatusChangeEvent] = field(
         init=False, default_factory=list, repr=True
     )
+    _status_event_json_bytes: Optional[tuple[int, bytes]] = field(
+        init=False, default=None, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.file_path.exists():
@@ -91,3 +95,19 @@ class StatusHistory:
             status_event["start_time"] = self._status_history[-2].timestamp
             status_event["end_time"] = self.current_status_event.timestamp
         return status_event
+
+    @property
+    def status_event_json_bytes(self) -> bytes:
+        """
+        status_event_json serialized, cached until the history changes.
+        The history is append only, so its length identifies the latest event.
+        """
+        if not self._status_history:
+            # the timestamp of an empty history is always the current time
+            return orjson.dumps(self.status_event_json)
+        cached = self._status_event_json_bytes
+        key = len(self._status_history)
+        if cached is None or cached[0] != key:
+            cached = (key, orjson.dumps(self.status_event_json))
+            self._status_event_json_bytes = cached
+        return cached[1]
@@ -18,6 +18,7 @@ if TYPE_CHECKING:
 class Step(ABC):
     skip: bool = field(init=False, default=False)
     status: ClassVar[Status] = Status.UNKNOWN
+    depends_on: ClassVar[tuple[type[Step], ...]] = ()
     success: Optional[bool] = field(init=False, default=None)
 
     @classmethod
@@ -1,15 +1,23 @@
-import json
+import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 
+import orjson
 from fastapi import APIRouter, BackgroundTasks, Form, Request, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from pydantic.functional_validators import BeforeValidator
 
 from ..local_paths import Paths
 from ..query.base import Query
 from ..query.demo_logger import DemoLoggerQuery
-from ..query.ipa import GateType, IPACoordinatorQuery, IPAHelperQuery
+from ..query.ipa import (
+    GateType,
+    IPACoordinatorQuery,
+    IPAHelperQuery,
+    helper_feature_flags,
+)
 from ..settings import get_settings
 from .http_helpers import check_capacity, get_query_from_query_id
 
@@ -21,10 +29,42 @@ router = APIRouter(
 )
 
 
+LOG_FILE_CHUNK_SIZE = 64 * 1024
+
+
 class IncorrectRoleError(Exception):
     pass
 
 
+def parse_gate_type(v: Any) -> Any:
+    # the web app sends the gate type's name (e.g., "compact"), not its value
+    if isinstance(v, str) and v.upper() in GateType.__members__:
+        return GateType[v.upper()]
+    return v
+
+
+# the start forms' fields are passed to the query as is, so they're named after
+# the query's fields
+class IPAHelperStartForm(BaseModel):
+    commit_hash: str
+    gate_type: Annotated[GateType, BeforeValidator(parse_gate_type)]
+    stall_detection: bool
+    multi_threading: bool
+    disable_metrics: bool
+    reveal_aggregation: bool
+
+
+class IPAQueryStartForm(BaseModel):
+    # the same fields, in the same order, as IPACoordinatorQuery
+    # pylint: disable=duplicate-code
+    commit_hash: str
+    size: int
+    max_breakdown_key: int
+    max_trigger_value: int
+    per_user_credit_cap: int
+    malicious_security: bool
+
+
 @router.get("/capacity-available")
 def capacity_available(
     request: Request,
@@ -61,17 +101,10 @@ def demo_logger(
     return {"message": "Process started successfully", "query_id": query_id}
 
 
-# pylint: disable=too-many-arguments
-# pylint: disable=too-many-positional-arguments
 @router.post("/ipa-helper/{query_id}")
 def start_ipa_helper(
     query_id: str,
-    commit_hash: Annotated[str, Form()],
-    gate_type: Annotated[str, Form()],
-    stall_detection: Annotated[bool, Form()],
-    multi_threading: Annotated[bool, Form()],
-    disable_metrics: Annotated[bool, Form()],
-    reveal_aggregation: Annotated[bool, Form()],
+    form: Annotated[IPAHelperStartForm, Form()],
     background_tasks: BackgroundTasks,
     request: Request,
 ):
@@ -85,12 +118,17 @@ def start_ipa_helper(
             f"Cannot start helper without helper role. Currently running {role=}."
         )
 
-    compiled_id = (
-        f"{commit_hash}_{gate_type}"
-        f"{'_stall-detection' if stall_detection else ''}"
-        f"{'_multi-threading' if multi_threading else ''}"
-        f"{'_disable-metrics' if disable_metrics else ''}"
-        f"{'_reveal-aggregation' if reveal_aggregation else ''}"
+    compiled_id = "_".join(
+        (
+            form.commit_hash,
+            *helper_feature_flags(
+                gate_type=form.gate_type,
+                stall_detection=form.stall_detection,
+                multi_threading=form.multi_threading,
+                disable_metrics=form.disable_metrics,
+                reveal_aggregation=form.reveal_aggregation,
+            ),
+        )
     )
 
     paths = Paths(
@@ -100,14 +138,9 @@ def start_ipa_helper(
     )
     query = IPAHelperQuery(
         paths=paths,
-        commit_hash=commit_hash,
         query_id=query_id,
-        gate_type=GateType[gate_type.upper()],
-        stall_detection=stall_detection,
-        multi_threading=multi_threading,
-        disable_metrics=disable_metrics,
-        reveal_aggregation=reveal_aggregation,
         port=settings.helper_port,
+        **form.model_dump(),
     )
     background_tasks.add_task(query_manager.run_query, query)
     return {"message": "Process started successfully", "query_id": query_id}
@@ -119,52 +152,82 @@ def get_query_status(
     request: Request,
 ):
     query = get_query_from_query_id(request.app.state.QUERY_MANAGER, Query, query_id)
-    return query.status_event_json
+    # polled by the other sidecars, so serve the cached serialization as is
+    return Response(
+        content=query.status_event_json_bytes, media_type="application/json"
+    )
+
+
+@router.get("/{query_id}/status-stream")
+def stream_query_status(
+    query_id: str,
+    request: Request,
+):
+    query = get_query_from_query_id(request.app.state.QUERY_MANAGER, Query, query_id)
+
+    async def status_events():
+        current_status = None
+        while True:
+            if query.status != current_status:
+                current_status = query.status
+                yield b"data: " + query.status_event_json_bytes + b"\n\n"
+            if query.finished:
+                return
+            await asyncio.sleep(0.1)
+
+    return StreamingResponse(status_events(), media_type="text/event-stream")
 
 
 @router.get("/{query_id}/log-file")
 def get_ipa_helper_log_file(
     query_id: str,
     request: Request,
+    raw: bool = False,
 ):
     query = get_query_from_query_id(request.app.state.QUERY_MANAGER, Query, query_id)
     settings = get_settings()
+    headers = {
+        "Content-Disposition": (
+            f'attachment; filename="{query_id}-{settings.role.name.title()}.log"'
+        )
+    }
+
+    if raw:
+        # served without reformatting, which allows a zero-copy sendfile
+        return FileResponse(
+            query.log_file_path,
+            headers=headers,
+            media_type="text/plain",
+        )
 
     def iterfile():
+        # batch lines into larger chunks, rather than one write per line
+        buf = bytearray()
         with open(query.log_file_path, "rb") as f:
             for line in f:
                 try:
-                    data = json.loads(line)
-                    d = datetime.fromtimestamp(
-                        float(data["record"]["time"]["timestamp"])
-                    )
-                    message = data["record"]["message"]
-                    yield f"{d.isoformat()} - {message}\n"
-                except (json.JSONDecodeError, KeyError):
-                    yield line
+                    record = orjson.loads(line)["record"]
+                    d = datetime.fromtimestamp(float(record["time"]["timestamp"]))
+                    buf += f"{d.isoformat()} - {record['message']}\n".encode()
+                except (orjson.JSONDecodeError, KeyError, TypeError):
+                    buf += line
+                if len(buf) >= LOG_FILE_CHUNK_SIZE:
+                    yield bytes(buf)
+                    buf.clear()
+        if buf:
+            yield bytes(buf)
 
     return StreamingResponse(
         iterfile(),
-        headers={
-            "Content-Disposition": (
-                f'attachment; filename="{query_id}-{settings.role.name.title()}.log"'
-            )
-        },
+        headers=headers,
         media_type="text/plain",
     )
 
 
-# pylint: disable=too-many-arguments
-# pylint: disable=too-many-positional-arguments
 @router.post("/ipa-query/{query_id}")
 def start_ipa_query(
     query_id: str,
-    commit_hash: Annotated[str, Form()],
-    size: Annotated[int, Form()],
-    max_breakdown_key: Annotated[int, Form()],
-    max_trigger_value: Annotated[int, Form()],
-    per_user_credit_cap: Annotated[int, Form()],
-    malicious_security: Annotated[bool, Form()],
+    form: Annotated[IPAQueryStartForm, Form()],
     background_tasks: BackgroundTasks,
     request: Request,
 ):
@@ -182,19 +245,15 @@ def start_ipa_query(
     paths = Paths(
         repo_path=settings.root_path / Path("ipa"),
         config_path=settings.config_path,
-        compiled_id=commit_hash,
+        compiled_id=form.commit_hash,
     )
-    test_data_path = paths.repo_path / Path("test_data/input")
     query = IPACoordinatorQuery(
         query_id=query_id,
         paths=paths,
-        commit_hash=commit_hash,
-        test_data_file=test_data_path / Path(f"events-{size}.txt"),
-        size=size,
-        max_breakdown_key=max_breakdown_key,
-        max_trigger_value=max_trigger_value,
-        per_user_credit_cap=per_user_credit_cap,
-        malicious_security=malicious_security,
+        test_data_file=paths.events_file(
+            form.size, form.max_breakdown_key, form.max_trigger_value
+        ),
+        **form.model_dump(),
     )
 
     background_tasks.add_task(query_manager.run_query, query)
@@ -74,6 +74,14 @@ class Settings(BaseSettings):
     def log_dir_path(self) -> Path:
         return self.root_path / Path("logs")
 
+    @property
+    def cargo_home_path(self) -> Path:
+        return self.root_path / Path("cargo_home")
+
+    @property
+    def sccache_dir_path(self) -> Path:
+        return self.root_path / Path("sccache")
+
 
 @lru_cache
 def get_settings():
@@ -1,5 +1,8 @@
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import ClassVar
 from unittest import mock
 from uuid import uuid4
 
@@ -7,6 +10,7 @@ import pytest
 
 from sidecar.app.query.base import MaxQueriesRunningError, Query, QueryManager
 from sidecar.app.query.status import Status
+from sidecar.app.query.step import Step
 
 
 @pytest.fixture(autouse=True)
@@ -22,6 +26,79 @@ def mock_settings_env_vars(tmp_path):
         yield
 
 
+@dataclass(kw_only=True)
+class FakeStep(Step):
+    events: ClassVar[list[str]] = []
+    barrier: ClassVar[threading.Barrier] = threading.Barrier(1)
+    succeeds: ClassVar[bool] = True
+
+    @classmethod
+    def build_from_query(cls, query):
+        return cls()
+
+    def run(self):
+        self.barrier.wait(timeout=5)
+        self.events.append(type(self).__name__)
+        self.success = self.succeeds
+
+    def terminate(self):
+        return
+
+    def kill(self):
+        return
+
+    @property
+    def cpu_usage_percent(self) -> float:
+        return 0
+
+    @property
+    def memory_rss_usage(self) -> int:
+        return 0
+
+
+@dataclass(kw_only=True)
+class FakeFirstStep(FakeStep):
+    status: ClassVar[Status] = Status.STARTING
+
+
+@dataclass(kw_only=True)
+class FakeParallelStepA(FakeStep):
+    status: ClassVar[Status] = Status.COMPILING
+    depends_on: ClassVar[tuple[type[Step], ...]] = (FakeFirstStep,)
+    barrier: ClassVar[threading.Barrier] = threading.Barrier(2)
+
+
+@dataclass(kw_only=True)
+class FakeParallelStepB(FakeParallelStepA):
+    status: ClassVar[Status] = Status.WAITING_TO_START
+
+
+@dataclass(kw_only=True)
+class FakeLastStep(FakeStep):
+    status: ClassVar[Status] = Status.IN_PROGRESS
+    depends_on: ClassVar[tuple[type[Step], ...]] = (
+        FakeParallelStepA,
+        FakeParallelStepB,
+    )
+
+
+@dataclass
+class FakeQuery(Query):
+    step_classes: ClassVar[list[type[Step]]] = [
+        FakeFirstStep,
+        FakeParallelStepA,
+        FakeParallelStepB,
+        FakeLastStep,
+    ]
+
+
+@pytest.fixture(name="fake_events")
+def _fake_events():
+    FakeStep.events.clear()
+    FakeParallelStepA.barrier.reset()
+    yield FakeStep.events
+
+
 def test_query_files():
     query = Query(str(uuid4()))
     assert not query.status_file_path.exists()
@@ -138,3 +215,22 @@ def test_query_manager_run_query_exception():
 
     assert query.query_id not in query_manager.running_queries
     assert query_manager.capacity_available
+
+
+def test_query_start_runs_independent_steps_concurrently(fake_events):
+    # both parallel steps wait on a shared barrier,
+    # so this only completes if they run at the same time
+    query = FakeQuery(str(uuid4()))
+    query.start()
+    assert query.status == Status.COMPLETE
+    assert fake_events[0] == "FakeFirstStep"
+    assert set(fake_events[1:3]) == {"FakeParallelStepA", "FakeParallelStepB"}
+    assert fake_events[3] == "FakeLastStep"
+
+
+def test_query_start_crashes_on_failed_step(fake_events):
+    query = FakeQuery(str(uuid4()))
+    with mock.patch.object(FakeFirstStep, "succeeds", False):
+        query.start()
+    assert query.status == Status.CRASHED
+    assert fake_events == ["FakeFirstStep"]
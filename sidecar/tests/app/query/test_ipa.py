@@ -0,0 +1,390 @@
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+from uuid import uuid4
+
+import httpx
+import loguru
+import pytest
+
+from sidecar.app.helpers import Helper, Role
+from sidecar.app.local_paths import Paths
+from sidecar.app.query.ipa import (
+    IPACargoFetchStep,
+    IPACheckoutCommitStep,
+    IPACoordinatorGenerateTestDataStep,
+    IPACoordinatorWaitForHelpersStep,
+    IPAEnsureBareRepoStep,
+    IPAFetchCommitStep,
+    IPAFetchPullRequestsStep,
+    IPAQuery,
+    commit_exists,
+)
+from sidecar.app.query.status import Status
+
+EMPTY_TREE_HASH = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+@pytest.fixture(autouse=True)
+def mock_settings_env_vars(tmp_path):
+    env_vars = {
+        "ROLE": "0",
+        "ROOT_PATH": str(tmp_path),
+        "CONFIG_PATH": str(Path("local_dev/config")),
+        "NETWORK_CONFIG_PATH": str(Path("local_dev/config") / Path("network.toml")),
+        "HELPER_PORT": str(17440),
+    }
+    with mock.patch.dict(os.environ, env_vars):
+        yield
+
+
+@pytest.fixture(name="ipa_query")
+def _ipa_query(tmp_path):
+    return IPAQuery(
+        query_id=str(uuid4()),
+        paths=Paths(
+            repo_path=tmp_path / Path("ipa"),
+            config_path=Path("local_dev/config"),
+            compiled_id="abcd1234",
+        ),
+        commit_hash="abcd1234",
+    )
+
+
+def test_send_kill_signals_continues_past_failed_helper(ipa_query):
+    def fake_kill_query(helper, query_id):
+        if helper.role == Role.HELPER_1:
+            raise httpx.ConnectError("helper is down")
+        return f"killed {query_id} on {helper.role}"
+
+    with mock.patch.object(
+        Helper, "kill_query", side_effect=fake_kill_query
+    ) as mock_kill_query:
+        ipa_query.send_kill_signals()
+
+    called_roles = {call.args[0].role for call in mock_kill_query.call_args_list}
+    assert called_roles == {Role.HELPER_1, Role.HELPER_2, Role.HELPER_3}
+
+
+@pytest.mark.parametrize("stream_status", [Status.UNKNOWN, Status.STARTING])
+def test_wait_for_helpers_step_stops_when_killed(ipa_query, stream_status):
+    def fake_stream_query_status(_helper, _query_id):
+        # a reachable helper streams events. an unreachable one ends the stream
+        while stream_status != Status.UNKNOWN:
+            yield stream_status
+            time.sleep(0.01)
+        yield stream_status
+
+    step = IPACoordinatorWaitForHelpersStep.build_from_query(ipa_query)
+    with mock.patch.object(Helper, "stream_query_status", fake_stream_query_status):
+        thread = threading.Thread(target=step.start)
+        thread.start()
+        time.sleep(0.1)
+        step.kill()
+        thread.join(timeout=1)
+    assert not thread.is_alive()
+    assert not step.success
+
+
+@pytest.mark.parametrize("lockfile_tracked", [False, True])
+def test_cargo_fetch_step_skips_fetched_lockfile(tmp_path, lockfile_tracked):
+    manifest_path = tmp_path / Path("ipa/Cargo.toml")
+    subprocess.run(["git", "init", "-q", str(manifest_path.parent)], check=True)
+    lockfile_path = manifest_path.with_name("Cargo.lock")
+    lockfile_path.write_text("version = 3\n", encoding="utf-8")
+    if lockfile_tracked:
+        subprocess.run(
+            ["git", "-C", str(manifest_path.parent), "add", lockfile_path.name],
+            check=True,
+        )
+
+    def build_step(commit_hash):
+        return IPACargoFetchStep(
+            manifest_path=manifest_path,
+            cargo_home=tmp_path / Path("cargo_home"),
+            commit_hash=commit_hash,
+            logger=loguru.logger,
+        )
+
+    step = build_step("a" * 40)
+    step.pre_run()
+    assert not step.skip
+    step.success = True
+    step.post_run()
+
+    step = build_step("a" * 40)
+    step.pre_run()
+    assert step.skip
+
+    # an untracked lockfile is left over from the previous checkout, which
+    # may have resolved different packages
+    step = build_step("b" * 40)
+    step.pre_run()
+    assert step.skip == lockfile_tracked
+
+    lockfile_path.write_text("version = 4\n", encoding="utf-8")
+    step = build_step("a" * 40)
+    step.pre_run()
+    assert not step.skip
+
+    # cargo fetch rewrites a stale lockfile, which is restored by the next checkout
+    step = build_step("a" * 40)
+    step.pre_run()
+    lockfile_path.write_text("version = 5\n", encoding="utf-8")
+    step.success = True
+    step.post_run()
+    lockfile_path.write_text("version = 4\n", encoding="utf-8")
+    step = build_step("a" * 40)
+    step.pre_run()
+    assert step.skip
+
+
+def test_cargo_fetch_step_marks_resolved_lockfile(tmp_path):
+    manifest_path = tmp_path / Path("ipa/Cargo.toml")
+    subprocess.run(["git", "init", "-q", str(manifest_path.parent)], check=True)
+
+    def build_step():
+        return IPACargoFetchStep(
+            manifest_path=manifest_path,
+            cargo_home=tmp_path / Path("cargo_home"),
+            commit_hash="a" * 40,
+            logger=loguru.logger,
+        )
+
+    step = build_step()
+    step.pre_run()
+    assert not step.skip
+    # no lockfile is committed, so cargo fetch resolves one
+    manifest_path.with_name("Cargo.lock").write_text("version = 3\n", "utf-8")
+    step.success = True
+    step.post_run()
+
+    step = build_step()
+    step.pre_run()
+    assert step.skip
+
+
+def commit_tree(repo_path, *parents):
+    return subprocess.run(
+        [
+            "git",
+            "-C",
+            str(repo_path),
+            "commit-tree",
+            "-m",
+            "test",
+            *(arg for parent in parents for arg in ("-p", parent)),
+            EMPTY_TREE_HASH,
+        ],
+        env={
+            **os.environ,
+            "GIT_AUTHOR_NAME": "test",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_COMMITTER_NAME": "test",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+        },
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+
+def partial_clone(tmp_path):
+    origin_path = tmp_path / Path("origin.git")
+    subprocess.run(["git", "init", "-q", "--bare", str(origin_path)], check=True)
+    subprocess.run(
+        ["git", "-C", str(origin_path), "config", "uploadpack.allowFilter", "true"],
+        check=True,
+    )
+    branch_commit_hash = commit_tree(origin_path)
+    pull_request_commit_hash = commit_tree(origin_path, branch_commit_hash)
+    for ref, commit_hash in [
+        ("refs/heads/main", branch_commit_hash),
+        ("refs/pull/1/head", pull_request_commit_hash),
+    ]:
+        subprocess.run(
+            ["git", "-C", str(origin_path), "update-ref", ref, commit_hash],
+            check=True,
+        )
+
+    bare_repo_path = tmp_path / Path("ipa.git")
+    subprocess.run(
+        [
+            "git",
+            "clone",
+            "-q",
+            "--bare",
+            "--filter=blob:none",
+            "--no-tags",
+            *(
+                f"--config=remote.origin.fetch={refspec}"
+                for refspec in IPAEnsureBareRepoStep.fetch_refspecs
+            ),
+            origin_path.as_uri(),
+            str(bare_repo_path),
+        ],
+        check=True,
+    )
+    return bare_repo_path, branch_commit_hash, pull_request_commit_hash
+
+
+def test_fetch_commit_step_skips_local_commit(tmp_path):
+    bare_repo_path, branch_commit_hash, pull_request_commit_hash = partial_clone(
+        tmp_path
+    )
+
+    def build_step(commit_hash):
+        return IPAFetchCommitStep(
+            bare_repo_path=bare_repo_path,
+            commit_hash=commit_hash,
+            logger=loguru.logger,
+        )
+
+    step = build_step(branch_commit_hash)
+    step.pre_run()
+    assert step.skip
+
+    # only on origin, which the check must not fetch from on demand
+    step = build_step(pull_request_commit_hash)
+    step.pre_run()
+    assert not step.skip
+    assert not commit_exists(bare_repo_path, pull_request_commit_hash)
+
+    step = build_step("0" * 40)
+    step.pre_run()
+    assert not step.skip
+
+
+def test_fetch_pull_requests_step_only_runs_for_missing_commit(tmp_path):
+    bare_repo_path, branch_commit_hash, pull_request_commit_hash = partial_clone(
+        tmp_path
+    )
+
+    def build_step(commit_hash):
+        return IPAFetchPullRequestsStep(
+            bare_repo_path=bare_repo_path,
+            commit_hash=commit_hash,
+            logger=loguru.logger,
+        )
+
+    step = build_step(branch_commit_hash)
+    step.pre_run()
+    assert step.skip
+
+    step = build_step(pull_request_commit_hash[:7])
+    step.start()
+    assert not step.skip
+    assert step.success
+    assert commit_exists(bare_repo_path, pull_request_commit_hash)
+
+
+@pytest.mark.parametrize("exit_code", [0, 1])
+def test_generate_test_data_step_reuses_complete_output(tmp_path, exit_code):
+    binary_path = tmp_path / Path("report_collector")
+    binary_path.write_text(f'#!/bin/sh\necho "$@"\nexit {exit_code}\n', "utf-8")
+    binary_path.chmod(0o755)
+    output_file_path = Paths(
+        repo_path=tmp_path / Path("ipa"),
+        config_path=Path("local_dev/config"),
+        compiled_id="abcd1234",
+    ).events_file(10, 32, 5)
+
+    def build_step():
+        return IPACoordinatorGenerateTestDataStep(
+            output_file_path=output_file_path,
+            report_collector_binary_path=binary_path,
+            size=10,
+            max_breakdown_key=32,
+            max_trigger_value=5,
+        )
+
+    step = build_step()
+    step.start()
+    assert not step.skip
+    assert step.success == (exit_code == 0)
+    assert not step.partial_file_path.exists()
+    assert output_file_path.exists() == (exit_code == 0)
+
+    step = build_step()
+    step.pre_run()
+    assert step.skip == (exit_code == 0)
+
+
+def test_ensure_bare_repo_step_configures_fetch_refspecs(tmp_path):
+    origin_path = tmp_path / Path("origin.git")
+    subprocess.run(["git", "init", "-q", "--bare", str(origin_path)], check=True)
+    bare_repo_path = tmp_path / Path("ipa.git")
+
+    with mock.patch.object(IPAEnsureBareRepoStep, "repo_url", origin_path.as_uri()):
+        step = IPAEnsureBareRepoStep(
+            bare_repo_path=bare_repo_path, logger=loguru.logger
+        )
+    step.start()
+    assert step.success
+    fetch_refspecs = subprocess.run(
+        [
+            "git",
+            "-C",
+            str(bare_repo_path),
+            "config",
+            "--get-all",
+            "remote.origin.fetch",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.splitlines()
+    assert fetch_refspecs == list(IPAEnsureBareRepoStep.fetch_refspecs)
+
+
+def test_ensure_bare_repo_step_removes_failed_clone(tmp_path):
+    bare_repo_path = tmp_path / Path("ipa.git")
+
+    with mock.patch.object(
+        IPAEnsureBareRepoStep, "repo_url", (tmp_path / Path("missing.git")).as_uri()
+    ):
+        step = IPAEnsureBareRepoStep(
+            bare_repo_path=bare_repo_path, logger=loguru.logger
+        )
+    step.start()
+    assert not step.success
+    assert not bare_repo_path.exists()
+
+
+@pytest.mark.parametrize("existing_clone", [False, True])
+def test_checkout_commit_step_reuses_worktree(tmp_path, existing_clone):
+    bare_repo_path = tmp_path / Path("ipa.git")
+    subprocess.run(["git", "init", "-q", "--bare", str(bare_repo_path)], check=True)
+    first_commit_hash = commit_tree(bare_repo_path)
+    second_commit_hash = commit_tree(bare_repo_path, first_commit_hash)
+    repo_path = tmp_path / Path("ipa")
+    if existing_clone:
+        subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+
+    def checkout(commit_hash):
+        step = IPACheckoutCommitStep(
+            bare_repo_path=bare_repo_path,
+            repo_path=repo_path,
+            commit_hash=commit_hash,
+            logger=loguru.logger,
+        )
+        step.start()
+        assert step.success
+        return step
+
+    step = checkout(first_commit_hash)
+    assert "worktree" in step.command.cmd
+    assert (repo_path / Path(".git")).is_file()
+
+    step = checkout(second_commit_hash)
+    assert "checkout" in step.command.cmd
+    head = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", "HEAD"],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+    assert head == second_commit_hash
@@ -2,6 +2,7 @@ import time
 from pathlib import Path
 
 import loguru
+import orjson
 import pytest
 
 from sidecar.app.query.status import Status, StatusChangeEvent, StatusHistory
@@ -115,6 +116,27 @@ def test_status_history_status_event_json(
     }
 
 
+def test_status_history_status_event_json_bytes(status_history_fixture):
+    assert orjson.loads(status_history_fixture.status_event_json_bytes)["status"] == (
+        Status.UNKNOWN.name
+    )
+
+    status_history_fixture.add(Status.COMPILING, 1.0)
+    status_event_json_bytes = status_history_fixture.status_event_json_bytes
+    assert orjson.loads(status_event_json_bytes) == {
+        "status": Status.COMPILING.name,
+        "start_time": 1.0,
+    }
+    assert status_history_fixture.status_event_json_bytes is status_event_json_bytes
+
+    status_history_fixture.add(Status.COMPLETE, 2.0)
+    assert orjson.loads(status_history_fixture.status_event_json_bytes) == {
+        "status": Status.COMPLETE.name,
+        "start_time": 1.0,
+        "end_time": 2.0,
+    }
+
+
 @pytest.mark.parametrize(
     "json_input,expected_status",
     [
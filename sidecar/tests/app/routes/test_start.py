@@ -1,3 +1,5 @@
+import json
+from datetime import datetime
 from unittest import mock
 from uuid import uuid4
 
@@ -6,6 +8,7 @@ from fastapi.testclient import TestClient
 
 from sidecar.app.helpers import Role
 from sidecar.app.main import app
+from sidecar.app.query.ipa import IPAHelperCompileStep
 from sidecar.app.query.status import Status
 from sidecar.app.routes.start import IncorrectRoleError, Query
 from sidecar.app.settings import get_settings
@@ -74,6 +77,59 @@ def test_start_ipa_helper(mock_role):
             mock_query_manager.assert_called_once()
 
 
+def test_start_ipa_helper_feature_flags(mock_role):
+    settings = mock_role(Role.HELPER_1)
+    with mock.patch("sidecar.app.routes.start.get_settings", return_value=settings):
+        with mock.patch(
+            "sidecar.app.query.base.QueryManager.run_query"
+        ) as mock_query_manager:
+            query_id = str(uuid4())
+            response = client.post(
+                f"/start/ipa-helper/{query_id}",
+                data={
+                    "commit_hash": "abcd1234",
+                    "gate_type": "compact",
+                    "stall_detection": True,
+                    "multi_threading": False,
+                    "disable_metrics": True,
+                    "reveal_aggregation": False,
+                },
+            )
+            assert response.status_code == 200
+    query = mock_query_manager.call_args.args[0]
+    assert query.paths.compiled_id == (
+        "abcd1234_web-app_real-world-infra_compact-gate"
+        "_stall-detection_disable-metrics"
+    )
+    step = IPAHelperCompileStep.build_from_query(query)
+    assert (
+        "--features=web-app real-world-infra compact-gate "
+        "stall-detection disable-metrics"
+    ) in step.command.cmd
+
+
+def test_start_ipa_helper_invalid_gate_type(mock_role):
+    settings = mock_role(Role.HELPER_1)
+    with mock.patch("sidecar.app.routes.start.get_settings", return_value=settings):
+        with mock.patch(
+            "sidecar.app.query.base.QueryManager.run_query"
+        ) as mock_query_manager:
+            query_id = str(uuid4())
+            response = client.post(
+                f"/start/ipa-helper/{query_id}",
+                data={
+                    "commit_hash": "abcd1234",
+                    "gate_type": "not-a-gate",
+                    "stall_detection": True,
+                    "multi_threading": True,
+                    "disable_metrics": True,
+                    "reveal_aggregation": True,
+                },
+            )
+            assert response.status_code == 422
+            mock_query_manager.assert_not_called()
+
+
 def test_start_ipa_helper_as_coordinator(mock_role):
     settings = mock_role(Role.COORDINATOR)
     with pytest.raises(IncorrectRoleError):
@@ -159,6 +215,27 @@ def test_get_status_complete(running_query):
     assert "end_time" in status_event_json
 
 
+def test_stream_status_not_found():
+    query_id = str(uuid4())
+    response = client.get(f"/start/{query_id}/status-stream")
+    assert response.status_code == 404
+
+
+def test_stream_status_complete(running_query):
+    running_query.status = Status.COMPLETE
+    response = client.get(f"/start/{running_query.query_id}/status-stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line.removeprefix("data:"))
+        for line in response.text.splitlines()
+        if line.startswith("data:")
+    ]
+    assert len(events) == 1
+    assert events[0]["status"] == str(Status.COMPLETE.name)
+    assert "end_time" in events[0]
+
+
 def test_get_ipa_helper_log_file_not_found():
     query_id = str(uuid4())
     response = client.get(f"/start/{query_id}/log-file")
@@ -171,3 +248,26 @@ def test_get_ipa_helper_log_file(running_query):
     response = client.get(f"/start/{running_query.query_id}/log-file")
     assert response.status_code == 200
     assert response.text.startswith(test_file_content)
+
+
+def test_get_ipa_helper_log_file_formats_records(running_query):
+    timestamp = 1718000000.123456
+    record = {"record": {"time": {"timestamp": timestamp}, "message": "log 1"}}
+    running_query.log_file_path.write_text(
+        json.dumps(record) + "\nnot json\n", encoding="utf-8"
+    )
+    response = client.get(f"/start/{running_query.query_id}/log-file")
+    assert response.status_code == 200
+    assert response.text.startswith(
+        f"{datetime.fromtimestamp(timestamp).isoformat()} - log 1\nnot json\n"
+    )
+
+
+def test_get_ipa_helper_log_file_raw(running_query):
+    record = {"record": {"time": {"timestamp": 1718000000.0}, "message": "log 1"}}
+    test_file_content = json.dumps(record) + "\n"
+    running_query.log_file_path.write_text(test_file_content, encoding="utf-8")
+    response = client.get(f"/start/{running_query.query_id}/log-file?raw=1")
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].startswith("attachment;")
+    assert response.text.startswith(test_file_content)
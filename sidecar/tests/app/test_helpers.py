@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from unittest import mock
+from urllib.parse import urlparse
+
+import httpx
+import pytest
+
+from sidecar.app.helpers import Helper, Role
+from sidecar.app.query.status import Status
+
+
+@pytest.fixture(name="helper")
+def _helper():
+    return Helper(
+        role=Role.HELPER_1,
+        helper_url=urlparse("https://localhost:7431"),
+        sidecar_url=urlparse("https://localhost:17431"),
+        public_key=None,
+    )
+
+
+def fake_stream(lines):
+    @contextmanager
+    def stream(*_args, **_kwargs):
+        def iter_lines():
+            yield from lines
+            raise httpx.ReadTimeout("no data")
+
+        yield mock.Mock(status_code=httpx.codes.OK, iter_lines=iter_lines)
+
+    return stream
+
+
+@pytest.mark.parametrize(
+    "lines,expected_statuses",
+    [
+        ([], [Status.UNKNOWN]),
+        (['data: {"status": "COMPILING"}', ""], [Status.COMPILING]),
+    ],
+)
+def test_stream_query_status_read_timeout(helper, lines, expected_statuses):
+    with mock.patch("httpx.stream", fake_stream(lines)):
+        assert list(helper.stream_query_status("abc")) == expected_statuses